@@ -1,14 +1,64 @@
-from flask import Flask, request, jsonify
+import numpy as np
+import orjson
+from flask import Flask, request
+from flask_compress import Compress
+from ml_model import PhishingURLDetector
+from url_validator import URLValidator
 app = Flask(__name__)
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_LEVEL'] = 5
+Compress(app)
+ml_detector = PhishingURLDetector()
+MAX_BATCH_URLS = 1000
+def ojson(payload, status=200):
+    body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC)
+    return app.response_class(body, status=status, mimetype='application/json')
+def _invalid_result():
+    return {"verdict": "INVALID", "url_type": "invalid", "message": "Input is not a valid URL or email"}
+def _predict_core(url):
+    classified = URLValidator.validate_and_classify(url)
+    if not classified.is_valid:
+        return _invalid_result(), 200
+    is_phishing, confidence = ml_detector.predict(url.strip().lower())
+    result = "PHISHING" if is_phishing else "SAFE"
+    return {"verdict": result, "url_type": classified.type, "confidence": confidence}, 200
+def _predict_batch_core(urls):
+    if len(urls) > MAX_BATCH_URLS:
+        return {"error": f"at most {MAX_BATCH_URLS} urls per request"}, 400
+    if not all(isinstance(url, str) for url in urls):
+        return {"error": "urls must be a list of strings"}, 400
+    classified = [URLValidator.validate_and_classify(url) for url in urls]
+    valid = [url.strip().lower() for url, c in zip(urls, classified) if c.is_valid]
+    is_phishing, probabilities = ml_detector.predict_batch(valid)
+    confidences = np.where(is_phishing, probabilities, 1.0 - probabilities)
+    scored = iter(zip(is_phishing, confidences))
+    results = []
+    for url, c in zip(urls, classified):
+        if not c.is_valid:
+            results.append({"url": url, **_invalid_result()})
+            continue
+        flag, confidence = next(scored)
+        results.append({"url": url, "verdict": "PHISHING" if flag else "SAFE",
+                        "url_type": c.type, "confidence": float(confidence)})
+    return {"results": results}, 200
 @app.route('/predict', methods=['POST'])
 def predict():
-    data = request.get_json()
-    url = data.get("url", "").lower()
-    is_phishing = False
-    if len(url) > 50: is_phishing = True       
-    if "@" in url: is_phishing = True         
-    if "https" not in url: is_phishing = True    
-    result = "PHISHING" if is_phishing else "SAFE"
-    return jsonify({"verdict": result})
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return ojson({"error": "request body must be a JSON object"}, 400)
+    if "urls" in data:
+        if not isinstance(data["urls"], list):
+            return ojson({"error": "urls must be a list of strings"}, 400)
+        payload, status = _predict_batch_core(data["urls"])
+    else:
+        url = data.get("url", "")
+        if not isinstance(url, str):
+            return ojson({"error": "url must be a string"}, 400)
+        payload, status = _predict_core(url)
+    return ojson(payload, status)
+@app.route('/check', methods=['GET'])
+def check_url():
+    payload, status = _predict_core(request.args.get("url", ""))
+    return ojson(payload, status)
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5001)
@@ -1,15 +1,34 @@
+import os
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 from typing import Optional, Dict, List
 
+import cachetools
+
 
 class Database:
     def __init__(self, db_path='phishing_detector.db'):
         self.db_path = db_path
+        self._tls = threading.local()
+        self._mem = cachetools.TTLCache(maxsize=10_000, ttl=300)
+        self._lock = threading.Lock()
+        self._write_q = None
+        self._writer_pid = None
         self.init_database()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            self._tls.conn = conn
+        return conn
 
     def init_database(self):
         conn = self.get_connection()
@@ -19,94 +38,170 @@ class Database:
             CREATE TABLE IF NOT EXISTS urls (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 url TEXT NOT NULL,
-                urltype TEXT NOT NULL CHECK(url_type IN ('url', 'email')),
+                url_type TEXT NOT NULL CHECK(url_type IN ('url', 'email')),
                 is_phishing INTEGER NOT NULL CHECK(is_phishing IN (0, 1)),
-               
+                confidence REAL,
+                created_at INTEGER NOT NULL DEFAULT (strftime('%s', 'now')),
                 UNIQUE(url)
             )
         ''')
 
         db_pointer.execute('CREATE INDEX IF NOT EXISTS idx_url ON urls(url)')
-        db_pointer.execute('CREATE INDEX IF NOT EXISTS idx_url_type ON urls(urltype)')
-        
+        db_pointer.execute('CREATE INDEX IF NOT EXISTS idx_url_type ON urls(url_type)')
+        db_pointer.execute('CREATE INDEX IF NOT EXISTS idx_created_at ON urls(created_at)')
+
+        # Older databases stored CURRENT_TIMESTAMP text; convert those rows
+        # to epoch seconds so created_at sorts as a plain integer.
+        db_pointer.execute('''
+            UPDATE urls
+            SET created_at = CAST(strftime('%s', created_at) AS INTEGER)
+            WHERE typeof(created_at) = 'text'
+        ''')
 
-        conn.commit()
-        conn.close()
+    @staticmethod
+    def _format_timestamp(created_at) -> Optional[str]:
+        if created_at is None:
+            return None
+        return datetime.fromtimestamp(created_at, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
 
     def url_exists(self, url: str) -> bool:
+        with self._lock:
+            if url in self._mem:
+                return True
+
         conn = self.get_connection()
         db_pointer = conn.cursor()
 
         db_pointer.execute('SELECT COUNT(*) FROM urls WHERE url = ?', (url,))
         count = db_pointer.fetchone()[0]
 
-        conn.close()
         return count > 0
 
     def get_url_result(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            cached = self._mem.get(url)
+        if cached is not None:
+            return dict(cached)
+
         conn = self.get_connection()
         db_pointer = conn.cursor()
 
         db_pointer.execute('''
-            SELECT url, url_type, is_phishing, confidence, created
+            SELECT url, url_type, is_phishing, confidence, created_at
             FROM urls
             WHERE url = ?
         ''', (url,))
 
         row = db_pointer.fetchone()
-        conn.close()
 
         if row:
-            return {
+            result = {
                 'url': row[0],
-                'urltype': row[1],
+                'url_type': row[1],
                 'is_phishing': bool(row[2]),
                 'confidence': row[3],
-                'created': row[4]
+                'created': self._format_timestamp(row[4])
             }
+            with self._lock:
+                self._mem[url] = result
+            return dict(result)
         return None
 
-    def save_url_result(self, url: str, url_type: str,
-                        is_phishing: bool) -> bool:
+    def save_url_result(self, url: str, url_type: str, is_phishing: bool,
+                        confidence: Optional[float] = None) -> bool:
+        created_at = int(time.time())
+
+        # Readers are served from the in-memory cache until the background
+        # writer has committed the row.
+        with self._lock:
+            self._mem[url] = {
+                'url': url,
+                'url_type': url_type,
+                'is_phishing': bool(is_phishing),
+                'confidence': confidence,
+                'created': self._format_timestamp(created_at)
+            }
+
+            if self._writer_pid != os.getpid():
+                self._write_q = queue.Queue()
+                threading.Thread(target=self._flusher, args=(self._write_q,),
+                                 daemon=True).start()
+                self._writer_pid = os.getpid()
+
+        self._write_q.put((url, url_type, int(is_phishing), confidence, created_at))
+        return True
+
+    def flush(self):
+        if self._write_q is not None:
+            self._write_q.join()
+
+    def _flusher(self, pending, max_rows=256, max_wait=0.1):
         conn = self.get_connection()
-        db_pointer = conn.cursor()
 
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + max_wait
+
+            while len(batch) < max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_rows(conn, batch)
+            except Exception:
+                # One bad row rolls back the whole batch; write the rows one
+                # at a time so only the rows that really fail are lost.
+                for row in batch:
+                    try:
+                        self._write_rows(conn, [row])
+                    except Exception as e:
+                        print(f"Error saving to database: {e}")
+                        with self._lock:
+                            self._mem.pop(row[0], None)
+            finally:
+                for _ in batch:
+                    pending.task_done()
+
+    @staticmethod
+    def _write_rows(conn, rows):
         try:
-            db_pointer.execute('''
+            conn.execute('BEGIN')
+            conn.executemany('''
                 INSERT OR REPLACE INTO urls
-                (url, urltype, is_phishing)
+                (url, url_type, is_phishing, confidence, created_at)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (url, url_type, int(is_phishing))
-
-            conn.commit()
-            conn.close()
-            return True
-        except Exception as e:
-            print(f"Error saving to database: {e}")
-            conn.close()
-            return False
+            ''', rows)
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
 
     def get_recent_detections(self, limit: int = 10) -> List[Dict]:
         conn = self.get_connection()
         db_pointer = conn.cursor()
 
         db_pointer.execute('''
-            SELECT url, url_type, is_phishing,  
+            SELECT url, url_type, is_phishing, confidence, created_at
             FROM urls
             ORDER BY created_at DESC
             LIMIT ?
         ''', (limit,))
 
         rows = db_pointer.fetchall()
-        conn.close()
 
         return [
             {
                 'url': row[0],
-                'urltype': row[1],
+                'url_type': row[1],
                 'is_phishing': bool(row[2]),
-              
-                
+                'confidence': row[3],
+                'created': self._format_timestamp(row[4])
             }
             for row in rows
         ]
@@ -115,24 +210,19 @@ class Database:
         conn = self.get_connection()
         db_pointer = conn.cursor()
 
-        db_pointer.execute('SELECT COUNT(*) FROM urls')
-        total = db_pointer.fetchone()[0]
-
-        db_pointer.execute('SELECT COUNT(*) FROM urls WHERE is_phishing = 1')
-        phishingcount = db_pointer.fetchone()[0]
-
-        db_pointer.execute('SELECT COUNT(*) FROM urls WHERE urltype = "url"')
-        urlcount = db_pointer.fetchone()[0]
-
-        db_pointer.execute('SELECT COUNT(*) FROM urls WHERE urltype = "email"')
-        emailcount = db_pointer.fetchone()[0]
-
-        conn.close()
+        db_pointer.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(is_phishing), 0),
+                   COALESCE(SUM(url_type = 'url'), 0),
+                   COALESCE(SUM(url_type = 'email'), 0)
+            FROM urls
+        ''')
+        total, phishingcount, urlcount, emailcount = db_pointer.fetchone()
 
         return {
             'total': total,
             'phishing': phishingcount,
-            'safe': totalphishingcount,
+            'safe': total - phishingcount,
             'urls': urlcount,
             'emails': emailcount
         }
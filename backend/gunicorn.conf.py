@@ -0,0 +1,7 @@
+import os
+
+bind = "0.0.0.0:5001"
+worker_class = "gthread"
+workers = 2 * (os.cpu_count() or 1) + 1
+threads = 4
+preload_app = True
@@ -0,0 +1,67 @@
+import os
+import tempfile
+
+from database import Database
+
+
+def test_save_and_read_back():
+    """Test saving a result on a clean database and reading it back"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'test.db')
+        db = Database(db_path)
+
+        db.save_url_result('https://www.google.com', 'url', False, 0.97)
+        db.save_url_result('test@example.com', 'email', True, 0.8)
+        db.flush()
+
+        fresh = Database(db_path)
+        result = fresh.get_url_result('https://www.google.com')
+        assert result['url_type'] == 'url'
+        assert result['is_phishing'] is False
+        assert result['confidence'] == 0.97
+
+        assert fresh.url_exists('test@example.com')
+        assert fresh.get_statistics() == {
+            'total': 2, 'phishing': 1, 'safe': 1, 'urls': 1, 'emails': 1
+        }
+        assert len(fresh.get_recent_detections(limit=5)) == 2
+
+
+def test_failed_write_is_evicted():
+    """Test that a row the writer cannot commit is dropped from the cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'test.db'))
+
+        # url_type violates the CHECK constraint, so the INSERT fails.
+        db.save_url_result('https://bad.example', 'bogus', True, 0.5)
+        assert db.url_exists('https://bad.example')
+        db.flush()
+
+        assert db.get_url_result('https://bad.example') is None
+        assert not db.url_exists('https://bad.example')
+        assert db.get_statistics()['total'] == 0
+
+
+def test_failed_row_does_not_sink_its_batch():
+    """Test that valid rows flushed alongside a failing row are still stored"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'test.db'))
+
+        db.save_url_result('https://good1.example', 'url', False, 0.9)
+        db.save_url_result('https://bad.example', 'bogus', True, 0.5)
+        db.save_url_result('https://good2.example', 'url', True, 0.7)
+        db.flush()
+
+        assert db.get_url_result('https://bad.example') is None
+        assert db.get_statistics()['total'] == 2
+
+        fresh = Database(os.path.join(tmp, 'test.db'))
+        assert fresh.get_url_result('https://good1.example')['is_phishing'] is False
+        assert fresh.get_url_result('https://good2.example')['confidence'] == 0.7
+
+
+if __name__ == "__main__":
+    test_save_and_read_back()
+    test_failed_write_is_evicted()
+    test_failed_row_does_not_sink_its_batch()
+    print("Database tests passed!")
@@ -0,0 +1,98 @@
+from app import app, ml_detector, MAX_BATCH_URLS
+from url_validator import URLValidator
+
+URLS = [
+    'https://www.google.com',
+    'http://google.com-verify.tk',
+    'https://paypal-suspend.ml/login',
+    'http://192.168.1.1/login',
+    'https://www.google.com/login?redirect=evil.com',
+    'http://evil.com\\.google.com/login/verify-account',
+    'HTTPS://WWW.G00GLE.COM/Login/Verify?x=1&y=2&z=3',
+    'http://münchen.de/päth?q=١٢٣',
+    'github.com',
+    '',
+]
+
+# (input, is_valid, type, normalized), pinned to the original validator.
+VALIDATOR_CASES = [
+    ('https://www.google.com', True, 'url', 'https://www.google.com'),
+    ('google.com', True, 'url', 'http://google.com'),
+    ('  spaced.com  ', True, 'url', 'http://spaced.com'),
+    ('HTTP://EXAMPLE.ORG/Path?q=1', True, 'url', 'http://example.org/path?q=1'),
+    ('HTTP://LOCALHOST:8080/x', True, 'url', 'http://localhost:8080/x'),
+    ('foo..combar', True, 'url', 'http://foo..combar'),
+    ('example.CO.UK', True, 'url', 'http://example.co.uk'),
+    ('192.168.1.1', True, 'url', 'http://192.168.1.1'),
+    ('999.999.999.999', True, 'url', 'http://999.999.999.999'),
+    ('1.2.3.4:80/x', True, 'url', 'http://1.2.3.4:80/x'),
+    ('http://999.1.1.1/a', True, 'url', 'http://999.1.1.1/a'),
+    ('ftp://x.y', True, 'url', 'ftp://x.y'),
+    ('test@example.com', True, 'email', 'test@example.com'),
+    ('Test@Example.COM ', True, 'email', 'test@example.com'),
+    ('a@b.c..com', True, 'email', 'a@b.c..com'),
+    ('K@example.com', True, 'url', 'http://k@example.com'),
+    ('ſite.com', True, 'url', 'http://ſite.com'),
+    ('user@host.com/path', True, 'url', 'http://user@host.com/path'),
+    ('münchen.de', True, 'url', 'http://münchen.de'),
+    ('', False, 'invalid', ''),
+    ('   ', False, 'invalid', '   '),
+    ('/path/only', False, 'invalid', '/path/only'),
+    ('http://', False, 'invalid', 'http://'),
+    ('://', False, 'invalid', '://'),
+]
+
+
+def test_predict_batch_matches_predict():
+    """Test that batch scoring agrees with single-URL scoring"""
+    is_phishing, probabilities = ml_detector.predict_batch(URLS)
+    assert len(is_phishing) == len(probabilities) == len(URLS)
+
+    for url, flag, probability in zip(URLS, is_phishing, probabilities):
+        verdict, confidence = ml_detector.predict(url)
+        assert verdict == bool(flag), url
+        expected = probability if flag else 1.0 - probability
+        assert abs(confidence - expected) < 1e-9, url
+
+    is_phishing, probabilities = ml_detector.predict_batch([])
+    assert len(is_phishing) == 0 and len(probabilities) == 0
+
+
+def test_predict_rejects_bad_bodies():
+    """Test the 400 responses of /predict"""
+    client = app.test_client()
+    bad_requests = [
+        {'json': {'urls': [1]}},
+        {'json': {'urls': ['https://www.google.com', None]}},
+        {'json': {'urls': ['a.com'] * (MAX_BATCH_URLS + 1)}},
+        {'json': {'urls': 'https://www.google.com'}},
+        {'json': {'url': 5}},
+        {'json': ['https://www.google.com']},
+        {'data': 'not json', 'content_type': 'application/json'},
+    ]
+    for kwargs in bad_requests:
+        response = client.post('/predict', **kwargs)
+        assert response.status_code == 400, kwargs
+        assert 'error' in response.get_json()
+
+    response = client.post('/predict', json={'urls': ['HTTPS://Example.COM/A', '']})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [r['url'] for r in results] == ['HTTPS://Example.COM/A', '']
+    assert results[1]['verdict'] == 'INVALID'
+
+
+def test_validate_and_classify_regressions():
+    """Test validator results against a fixed list of inputs"""
+    for text, is_valid, kind, normalized in VALIDATOR_CASES:
+        result = URLValidator.validate_and_classify(text)
+        assert tuple(result) == (is_valid, kind, normalized), text
+        assert URLValidator.is_email(text) == (kind == 'email'), text
+        assert URLValidator.is_url(text) == (kind == 'url'), text
+
+
+if __name__ == "__main__":
+    test_predict_batch_matches_predict()
+    test_predict_rejects_bad_bodies()
+    test_validate_and_classify_regressions()
+    print("Prediction tests passed!")
@@ -9,24 +9,45 @@ except ImportError:
 from ml_model import PhishingURLDetector
 import os
 
+_detector = None
+
+
+def get_detector() -> PhishingURLDetector:
+    global _detector
+    if _detector is None:
+        _detector = PhishingURLDetector()
+    return _detector
+
 
 def load_interpreter(model_path: str) -> "tf.lite.Interpreter":
     interpreter = tf.lite.Interpreter(model_path=model_path)
     interpreter.allocate_tensors()
+    # Tensor details don't change after allocate_tensors, so look them up once.
+    interpreter.input_details = interpreter.get_input_details()
+    interpreter.output_details = interpreter.get_output_details()
     return interpreter
 
 
 def run_inference(interpreter: "tf.lite.Interpreter", features: np.ndarray) -> float:
-    input_details = interpreter.get_input_details()
-    output_details = interpreter.get_output_details()
-
-    interpreter.set_tensor(input_details[0]["index"], features)
+    interpreter.set_tensor(interpreter.input_details[0]["index"], features)
     interpreter.invoke()
 
-    output_data = interpreter.get_tensor(output_details[0]["index"])
+    output_data = interpreter.get_tensor(interpreter.output_details[0]["index"])
     return float(output_data[0][0])
 
 
+def run_batch_inference(interpreter: "tf.lite.Interpreter", features: np.ndarray) -> np.ndarray:
+    input_index = interpreter.input_details[0]["index"]
+    interpreter.resize_tensor_input(input_index, features.shape)
+    interpreter.allocate_tensors()
+
+    interpreter.set_tensor(input_index, features)
+    interpreter.invoke()
+
+    output_data = interpreter.get_tensor(interpreter.output_details[0]["index"])
+    return output_data[:, 0]
+
+
 def test_tflite_model(model_path='phishing_model.tflite'):
     if not os.path.exists(model_path):
         print(f" Model file not found: {model_path}")
@@ -37,13 +58,13 @@ def test_tflite_model(model_path='phishing_model.tflite'):
     print(f"Loading model: {model_path}")
     interpreter = load_interpreter(model_path)
 
-    input_details = interpreter.get_input_details()
-    output_details = interpreter.get_output_details()
+    input_details = interpreter.input_details
+    output_details = interpreter.output_details
 
     print(f" Model Input Shape: {input_details[0]['shape']}")
     print(f" Model Output Shape: {output_details[0]['shape']}")
 
-    detector = PhishingURLDetector()
+    detector = get_detector()
 
     test_urls = [
         ("https://www.google.com", False),
@@ -63,9 +84,12 @@ def test_tflite_model(model_path='phishing_model.tflite'):
     correct = 0
     total = len(test_urls)
 
-    for url, expected_phishing in test_urls:
-        features = detector.extract_features(url).reshape(1, -1).astype(np.float32)
-        phishing_probability = run_inference(interpreter, features)
+    # One invoke for the whole list instead of one per URL.
+    X = np.stack([detector.extract_features(url) for url, _ in test_urls]).astype(np.float32)
+    probabilities = run_batch_inference(interpreter, X)
+
+    for (url, expected_phishing), phishing_probability in zip(test_urls, probabilities):
+        phishing_probability = float(phishing_probability)
         is_phishing = phishing_probability > 0.5
         confidence = phishing_probability if is_phishing else (1 - phishing_probability)
 
@@ -97,7 +121,7 @@ def test_custom_url(model_path='phishing_model.tflite', url=None):
         url = input("Enter URL to test: ").strip()
 
     interpreter = load_interpreter(model_path)
-    detector = PhishingURLDetector()
+    detector = get_detector()
 
     features = detector.extract_features(url).reshape(1, -1).astype(np.float32)
     phishing_probability = run_inference(interpreter, features)
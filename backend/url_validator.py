@@ -1,28 +1,61 @@
 import re
+import socket
+from typing import NamedTuple
 from urllib.parse import urlparse
 
 
+class ClassifyResult(NamedTuple):
+    is_valid: bool
+    type: str
+    normalized: str
+
+
 class URLValidator:
 
     EMAIL_PATTERN = re.compile(
         r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     )
 
+    # Character classes spell out both cases instead of using re.IGNORECASE,
+    # which folds every input character at match time; only the short
+    # scheme and localhost literals stay case-insensitive.
     URL_PATTERN = re.compile(
-        r'^https?://'
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
-        r'localhost|'
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+        r'^(?i:https?)://'
+        r'(?:(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,6}\.?|'
+        r'(?i:localhost))'
         r'(?::\d+)?'
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE
+        r'(?:/?|[/?]\S+)$'
     )
 
     URLPATTERN = re.compile(
-        r'^(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
-        r'localhost|\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
-        r'(?::\d+)?(?:/?|[/?]\S+)?$', re.IGNORECASE
+        r'^(?:(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,6}\.?|'
+        r'(?i:localhost))'
+        r'(?::\d+)?(?:/?|[/?]\S+)?$'
+    )
+
+    # One anchored match classifies text as an email or either URL form.
+    # Branches are tried in order, so the result matches running the three
+    # patterns one after another.
+    CLASSIFIER_PATTERN = re.compile(
+        f'(?P<email>{EMAIL_PATTERN.pattern})'
+        f'|(?P<url>{URL_PATTERN.pattern})'
+        f'|(?P<url_simple>{URLPATTERN.pattern})'
+    )
+
+    # IPv4 hosts are checked by socket.inet_aton instead of a counted-octet
+    # regex; this only picks out the candidate host.
+    IPV4_URL_PATTERN = re.compile(
+        r'^(?:(?i:https?)://)?([0-9.]+)(?::\d+)?(?:/?|[/?]\S+)$'
     )
 
+    COMMON_TLDS = (
+        '.com', '.org', '.net', '.edu', '.gov', '.io', '.co',
+        '.uk', '.de', '.fr', '.jp', '.cn', '.au', '.ca'
+    )
+
+    # Matches '.' + tld anywhere in the lowered text, in one scan.
+    TLD_INFIX_PATTERN = re.compile('|'.join(re.escape('.' + tld) for tld in COMMON_TLDS))
+
     @staticmethod
     def is_email(text: str) -> bool:
         if not text:
@@ -31,45 +64,53 @@ class URLValidator:
         text = text.strip()
         return bool(URLValidator.EMAIL_PATTERN.match(text))
 
+    @staticmethod
+    def _is_ipv4_host(host: str) -> bool:
+        try:
+            socket.inet_aton(host)
+        except OSError:
+            return False
+        return host.count('.') == 3
+
     @staticmethod
     def is_url(text: str) -> bool:
         if not text:
             return False
 
-        text = text.strip()
-
-        if URLValidator.is_email(text):
-            return False
+        return URLValidator._classify(text.strip()) == 'url'
 
-        if URLValidator.URL_PATTERN.match(text):
-            return True
+    # Shared by every public check: 'email', 'url' or None for stripped text.
+    @staticmethod
+    def _classify(text: str, low: str = None):
+        match = URLValidator.CLASSIFIER_PATTERN.match(text)
+        if match:
+            return 'email' if match.lastgroup == 'email' else 'url'
 
-        if URLValidator.URLPATTERN.match(text):
-            return True
+        match = URLValidator.IPV4_URL_PATTERN.match(text)
+        if match and URLValidator._is_ipv4_host(match.group(1)):
+            return 'url'
 
-        if text.lower().startswith('www.'):
-            return True
+        if low is None:
+            low = text.lower()
 
-        common_tlds = [
-            '.com', '.org', '.net', '.edu', '.gov', '.io', '.co',
-            '.uk', '.de', '.fr', '.jp', '.cn', '.au', '.ca'
-        ]
+        if low.startswith('www.'):
+            return 'url'
 
-        if any(text.lower().endswith(tld) or f'.{tld}' in text.lower()
-               for tld in common_tlds):
+        if (low.endswith(URLValidator.COMMON_TLDS)
+                or URLValidator.TLD_INFIX_PATTERN.search(low)):
             if '@' not in text:
-                return True
+                return 'url'
 
         try:
             test_url = text if '://' in text else 'http://' + text
             parsed = urlparse(test_url)
 
             if parsed.netloc or (parsed.path and '.' in parsed.path):
-                return True
+                return 'url'
         except:
             pass
 
-        return False
+        return None
 
     @staticmethod
     def normalize_url(url: str) -> str:
@@ -78,48 +119,24 @@ class URLValidator:
         if not url:
             return url
 
-        if URLValidator.is_email(url):
-            return url
-
-        if '://' in url:
-            return url
-
-        if URLValidator.is_url(url):
+        if '://' not in url and URLValidator._classify(url) == 'url':
             return 'http://' + url
 
         return url
 
     @staticmethod
-    def validate_and_classify(text: str) -> dict:
+    def validate_and_classify(text: str) -> ClassifyResult:
         if not text or not text.strip():
-            return {
-                'is_valid': False,
-                'type': 'invalid',
-                'normalized': text
-            }
+            return ClassifyResult(False, 'invalid', text)
 
         text = text.strip()
+        low = text.lower()
+        kind = URLValidator._classify(text, low)
 
-        if URLValidator.is_email(text):
-            return {
-                'is_valid': True,
-                'type': 'email',
-                'normalized': text.lower()
-            }
-
-        if URLValidator.is_url(text):
-            normalized = URLValidator.normalize_url(text)
-            return {
-                'is_valid': True,
-                'type': 'url',
-                'normalized': normalized.lower()
-            }
-
-        return {
-            'is_valid': False,
-            'type': 'invalid',
-            'normalized': text
-        }
-
+        if kind == 'email':
+            return ClassifyResult(True, 'email', low)
 
+        if kind == 'url':
+            return ClassifyResult(True, 'url', low if '://' in low else 'http://' + low)
 
+        return ClassifyResult(False, 'invalid', text)